@@ -9,13 +9,10 @@ from textual.screen import ModalScreen
 from textual.binding import Binding
 from textual.reactive import reactive
 from textual import events
-
-from safetensors.torch import load_file as load_safetensors
-from safetensors import safe_open
-import gguf
+from textual.timer import Timer
 
 from .tree import TreeBuilder, TreeNode, TensorInfo, MetadataInfo
-from .utils import format_shape, format_size, format_parameters
+from .utils import format_size, format_parameters
 from .loader import ModelLoader
 
 class DetailScreen(ModalScreen):
@@ -101,6 +98,8 @@ class SafetensorsExplorerApp(App):
         Binding("enter", "select_node", "Expand/Details"),
     ]
 
+    # Delay before applying a search, so fast typing only rebuilds once
+    SEARCH_DEBOUNCE_SECONDS = 0.06
 
 
     def __init__(self, files: List[Path]):
@@ -111,6 +110,10 @@ class SafetensorsExplorerApp(App):
         self.metadata: List[MetadataInfo] = []
         self.root_nodes: List[TreeNode] = []
         self.total_parameters = 0
+        # Last applied search filter and its result, for incremental filtering
+        self._filter_text = ""
+        self._filtered_nodes: List[TreeNode] = []
+        self._search_timer: Optional[Timer] = None
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -131,34 +134,44 @@ class SafetensorsExplorerApp(App):
         self.tensors = self.loader.tensors
         self.metadata = self.loader.metadata
         self.total_parameters = self.loader.total_parameters
+        self.root_nodes = TreeBuilder.build_tree_mixed(self.tensors, self.metadata)
 
     def build_tree(self, filter_text: str = "") -> None:
+        nodes = self.filter_nodes(filter_text.lower())
+
         tree_widget = self.query_one("#file-tree", Tree)
-        tree_widget.clear()
-        tree_widget.root.expand()
-
-        # Filter tensors if needed
-        filtered_tensors = self.tensors
-        filtered_metadata = self.metadata
-        
-        if filter_text:
-            filtered_tensors = [t for t in self.tensors if filter_text.lower() in t.name.lower()]
-            filtered_metadata = [m for m in self.metadata if filter_text.lower() in m.name.lower()]
-
-        nodes = TreeBuilder.build_tree_mixed(filtered_tensors, filtered_metadata)
-        
-        for node in nodes:
-            self.add_node_to_tree(tree_widget.root, node)
-
-    def add_node_to_tree(self, parent_node, node_data: TreeNode) -> None:
-        label = self.format_node_label(node_data)
-        tree_node = parent_node.add(label, data=node_data, expand=node_data.expanded)
-        
-        if node_data.children:
-            for child in node_data.children:
-                self.add_node_to_tree(tree_node, child)
+        # Suspend repaints so the widget is only redrawn once fully populated
+        with self.batch_update():
+            tree_widget.clear()
+            tree_widget.root.expand()
+            self.add_nodes_to_tree(tree_widget.root, nodes)
+
+    def filter_nodes(self, filter_text: str) -> List[TreeNode]:
+        if not filter_text:
+            nodes = self.root_nodes
+        elif self._filter_text and self._filter_text in filter_text:
+            # A query containing the previous one can only narrow its matches
+            nodes = TreeBuilder.filter_tree(self._filtered_nodes, filter_text)
         else:
-            tree_node.allow_expand = False
+            nodes = TreeBuilder.filter_tree(self.root_nodes, filter_text)
+
+        self._filter_text = filter_text
+        self._filtered_nodes = nodes
+        return nodes
+
+    def add_nodes_to_tree(self, parent_node, nodes: List[TreeNode]) -> None:
+        # Depth-first with an explicit stack; children are pushed in reverse
+        # so they are added in their sorted order
+        stack = [(parent_node, node) for node in reversed(nodes)]
+        while stack:
+            parent, node_data = stack.pop()
+            label = self.format_node_label(node_data)
+            tree_node = parent.add(label, data=node_data, expand=node_data.expanded)
+
+            if node_data.children:
+                stack.extend((tree_node, child) for child in reversed(node_data.children))
+            else:
+                tree_node.allow_expand = False
 
     def format_node_label(self, node: TreeNode) -> str:
         if node.is_group:
@@ -166,7 +179,7 @@ class SafetensorsExplorerApp(App):
         elif node.is_tensor:
             info = node.tensor_info
             name = info.name.split('.')[-1]
-            return f"📄 {name} [{info.dtype}, {format_shape(info.shape)}, {format_size(info.size_bytes)}]"
+            return f"📄 {name} [{info.dtype}, {info.formatted_shape}, {info.formatted_size}]"
         elif node.is_metadata:
             info = node.metadata_info
             val = info.value
@@ -179,6 +192,7 @@ class SafetensorsExplorerApp(App):
         self.query_one("#search-input").focus()
 
     def action_clear_search(self) -> None:
+        self.cancel_search_timer()
         self.remove_class("search-active")
         self.query_one("#search-input").value = ""
         self.build_tree()
@@ -186,7 +200,20 @@ class SafetensorsExplorerApp(App):
 
     def on_input_changed(self, event: Input.Changed) -> None:
         if event.input.id == "search-input":
-            self.build_tree(event.value)
+            self.cancel_search_timer()
+            filter_text = event.value
+            # Nothing to do if this query is already displayed
+            if filter_text.lower() == self._filter_text:
+                return
+            self._search_timer = self.set_timer(
+                self.SEARCH_DEBOUNCE_SECONDS,
+                lambda: self.build_tree(filter_text)
+            )
+
+    def cancel_search_timer(self) -> None:
+        if self._search_timer is not None:
+            self._search_timer.stop()
+            self._search_timer = None
 
     def action_select_node(self) -> None:
         tree = self.query_one("#file-tree", Tree)
@@ -209,8 +236,8 @@ class SafetensorsExplorerApp(App):
             content = (
                 f"Name: {info.name}\n"
                 f"Data Type: {info.dtype}\n"
-                f"Shape: {format_shape(info.shape)}\n"
-                f"Size: {format_size(info.size_bytes)}\n"
+                f"Shape: {info.formatted_shape}\n"
+                f"Size: {info.formatted_size}\n"
                 f"Elements: {format_parameters(info.num_elements)}\n"
             )
             self.push_screen(DetailScreen("Tensor Details", content))
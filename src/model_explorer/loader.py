@@ -1,12 +1,48 @@
 import os
-from typing import List, Optional, Tuple, Dict
+import json
+import math
+import struct
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, List, Optional, Tuple, Dict
 from pathlib import Path
-from safetensors.torch import load_file as load_safetensors
-from safetensors import safe_open
-import gguf
 
 from .tree import TensorInfo, MetadataInfo
 
+if TYPE_CHECKING:
+    import gguf
+
+# Upper bound on threads used to read file headers concurrently
+MAX_LOAD_WORKERS = 8
+
+# The safetensors format caps the JSON header at 100MB
+MAX_SAFETENSORS_HEADER_SIZE = 100 * 1024 * 1024
+
+# Bytes per element for safetensors dtypes, only used when a header entry
+# lacks data_offsets
+_DTYPE_BYTES = {
+    "F64": 8, "F32": 4, "F16": 2, "BF16": 2, "F8_E4M3": 1, "F8_E5M2": 1,
+    "I64": 8, "I32": 4, "I16": 2, "I8": 1,
+    "U64": 8, "U32": 4, "U16": 2, "U8": 1,
+    "BOOL": 1,
+}
+
+# Longest metadata value kept for display
+MAX_METADATA_VALUE_LEN = 100
+
+def _format_gguf_field(field: "gguf.ReaderField") -> str:
+    """Format a GGUF metadata field value for display."""
+    import gguf
+
+    # Arrays (e.g. tokenizer vocabularies) can hold hundreds of thousands of
+    # items, so summarize them instead of stringifying their contents.
+    if field.types and field.types[0] == gguf.GGUFValueType.ARRAY:
+        return f"<array: {len(field.data)} items, type={field.types[-1].name}>"
+
+    val_str = str(field.parts[-1])
+    if len(val_str) > MAX_METADATA_VALUE_LEN:
+        val_str = val_str[:MAX_METADATA_VALUE_LEN - 3] + "..."
+    return val_str
+
 class ModelLoader:
     def __init__(self, files: List[Path]):
         self.files = files
@@ -15,83 +51,120 @@ class ModelLoader:
         self.total_parameters = 0
 
     def load(self) -> None:
-        for file_path in self.files:
-            ext = file_path.suffix.lower()
-            try:
-                if ext == ".safetensors":
-                    self.load_safetensors_file(file_path)
-                elif ext == ".gguf":
-                    self.load_gguf_file(file_path)
-            except Exception as e:
-                print(f"Error loading {file_path}: {e}")
+        if not self.files:
+            return
+
+        # Header parsing is I/O bound, so read the files concurrently and
+        # merge the results back in file order to keep deduplication stable.
+        results: Dict[int, Tuple[List[TensorInfo], List[MetadataInfo]]] = {}
+        with ThreadPoolExecutor(max_workers=min(MAX_LOAD_WORKERS, len(self.files))) as executor:
+            futures = {
+                executor.submit(self.load_file, file_path): idx
+                for idx, file_path in enumerate(self.files)
+            }
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    results[idx] = future.result()
+                except Exception as e:
+                    print(f"Error loading {self.files[idx]}: {e}")
 
         # Deduplicate tensors by name (if multiple files have same tensors)
-        unique_tensors = {}
-        for t in self.tensors:
-            if t.name not in unique_tensors:
-                unique_tensors[t.name] = t
+        # while merging, totalling parameters in the same pass
+        unique_tensors: Dict[str, TensorInfo] = {t.name: t for t in self.tensors}
+        total_parameters = self.total_parameters
+        for idx in sorted(results):
+            tensors, metadata = results[idx]
+            for t in tensors:
+                if t.name not in unique_tensors:
+                    unique_tensors[t.name] = t
+                    total_parameters += t.num_elements
+            self.metadata.extend(metadata)
+
         self.tensors = list(unique_tensors.values())
-        
-        self.total_parameters = sum(t.num_elements for t in self.tensors)
-
-    def load_safetensors_file(self, path: Path) -> None:
-        # Read metadata first
-        with safe_open(path, framework="pt") as f:
-            metadata = f.metadata()
-            if metadata:
-                for k, v in metadata.items():
-                    self.metadata.append(MetadataInfo(k, v, "string"))
-            
-            for key in f.keys():
-                tensor = f.get_slice(key)
-                shape = tensor.get_shape()
-                dtype = str(tensor.get_dtype())
-                # Calculate size roughly
-                num_elements = 1
-                for dim in shape:
-                    num_elements *= dim
-                
-                # Approximate bytes based on dtype string
-                bytes_per_elem = 4 # Default to float32
-                if "16" in dtype: bytes_per_elem = 2
-                elif "8" in dtype: bytes_per_elem = 1
-                elif "64" in dtype: bytes_per_elem = 8
-                
+        self.total_parameters = total_parameters
+
+    @staticmethod
+    def load_file(path: Path) -> Tuple[List[TensorInfo], List[MetadataInfo]]:
+        ext = path.suffix.lower()
+        if ext == ".safetensors":
+            return ModelLoader.load_safetensors_file(path)
+        elif ext == ".gguf":
+            return ModelLoader.load_gguf_file(path)
+        return [], []
+
+    @staticmethod
+    def load_safetensors_file(path: Path) -> Tuple[List[TensorInfo], List[MetadataInfo]]:
+        tensors: List[TensorInfo] = []
+        metadata_list: List[MetadataInfo] = []
+
+        # The file starts with a little-endian u64 header length followed by
+        # a JSON header describing every tensor, so no tensor data is touched.
+        with open(path, "rb") as f:
+            header_size = struct.unpack("<Q", f.read(8))[0]
+            if header_size > MAX_SAFETENSORS_HEADER_SIZE:
+                raise ValueError(f"Invalid safetensors header size: {header_size}")
+            header = json.loads(f.read(header_size))
+
+        metadata = header.pop("__metadata__", None)
+        if metadata:
+            for k, v in metadata.items():
+                metadata_list.append(MetadataInfo(k, v, "string"))
+
+        for key, info in header.items():
+            shape = info["shape"]
+            dtype = info["dtype"]
+            num_elements = math.prod(shape)
+
+            offsets = info.get("data_offsets")
+            if offsets:
+                size_bytes = offsets[1] - offsets[0]
+            else:
+                bytes_per_elem = _DTYPE_BYTES.get(dtype)
+                if bytes_per_elem is None:
+                    print(f"Warning: unknown dtype {dtype} for {key} in {path}, assuming 4 bytes per element")
+                    bytes_per_elem = 4
                 size_bytes = num_elements * bytes_per_elem
-                
-                self.tensors.append(TensorInfo(
-                    name=key,
-                    dtype=dtype,
-                    shape=list(shape),
-                    size_bytes=size_bytes,
-                    num_elements=num_elements
-                ))
-
-    def load_gguf_file(self, path: Path) -> None:
+
+            tensors.append(TensorInfo(
+                name=key,
+                dtype=dtype,
+                shape=list(shape),
+                size_bytes=size_bytes,
+                num_elements=num_elements
+            ))
+
+        return tensors, metadata_list
+
+    @staticmethod
+    def load_gguf_file(path: Path) -> Tuple[List[TensorInfo], List[MetadataInfo]]:
+        tensors: List[TensorInfo] = []
+        metadata: List[MetadataInfo] = []
+        import gguf
+
         reader = gguf.GGUFReader(str(path))
         
         # Metadata
         for field in reader.fields.values():
-            # Skip arrays for metadata display simplicity or format them
-            val_str = str(field.parts[-1])
-            if len(val_str) > 100: val_str = val_str[:97] + "..."
-            self.metadata.append(MetadataInfo(
+            metadata.append(MetadataInfo(
                 name=field.name,
-                value=val_str,
+                value=_format_gguf_field(field),
                 value_type=str(field.types[-1].name)
             ))
 
         # Tensors
         for tensor in reader.tensors:
-            shape = tensor.shape
-            num_elements = 1
-            for dim in shape:
-                num_elements *= dim
+            # GGUF dims and byte counts are numpy integers on some gguf
+            # versions; keep plain ints downstream
+            shape = [int(dim) for dim in tensor.shape]
+            num_elements = math.prod(shape)
             
-            self.tensors.append(TensorInfo(
+            tensors.append(TensorInfo(
                 name=tensor.name,
                 dtype=tensor.tensor_type.name,
-                shape=list(shape),
-                size_bytes=tensor.n_bytes,
+                shape=shape,
+                size_bytes=int(tensor.n_bytes),
                 num_elements=num_elements
             ))
+
+        return tensors, metadata
@@ -1,27 +1,68 @@
 import argparse
+import json
+import os
 import sys
 import glob
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Optional, Set
 
-from .app import SafetensorsExplorerApp
+MODEL_EXTENSIONS = (".safetensors", ".gguf")
+
+def _has_glob_magic(path_str: str) -> bool:
+    return any(c in path_str for c in "*?[")
+
+def _iter_model_files(root: Path, recursive: bool) -> Iterator[Path]:
+    """Yield model files under root using a single directory walk."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(Path(entry.path))
+                    elif entry.name.lower().endswith(MODEL_EXTENSIONS):
+                        yield Path(entry.path)
+        except OSError:
+            # Unreadable directories are skipped, like glob does
+            continue
+
+def _read_index_shards(index_path: Path) -> Optional[Set[Path]]:
+    """
+    Return the shard files listed in a safetensors index, or None if the
+    index can't be read or lists no existing shard so the caller can fall
+    back to scanning.
+    """
+    try:
+        with index_path.open() as f:
+            weight_map = json.load(f)["weight_map"]
+        shards = {index_path.parent / shard_name for shard_name in set(weight_map.values())}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"Error reading {index_path}: {e}", file=sys.stderr)
+        return None
+
+    shards = {shard for shard in shards if shard.exists()}
+    return shards or None
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 def collect_files(paths: List[str], recursive: bool) -> List[Path]:
     collected_files = []
     
     for path_str in paths:
         # Expand glob patterns
-        expanded_paths = glob.glob(path_str, recursive=recursive)
+        expanded_paths = glob.glob(path_str, recursive=recursive) if _has_glob_magic(path_str) else []
         if not expanded_paths:
-            # If glob didn't match anything, try treating it as a literal path
-            # (glob.glob might return empty if no wildcards and file doesn't exist, 
-            # or if it's just a direct path)
+            # Plain paths, and literal names containing glob characters
+            # (e.g. "m[v2].safetensors"), are used as-is if they exist.
+            # Non-existent files are skipped
             if Path(path_str).exists():
                 expanded_paths = [path_str]
-            else:
-                # If it was a glob pattern that matched nothing, or a non-existent file
-                # we can warn or skip. For now, let's just skip.
-                pass
 
         for p in expanded_paths:
             path = Path(p)
@@ -30,24 +71,21 @@ def collect_files(paths: List[str], recursive: bool) -> List[Path]:
                 
             if path.is_file():
                 ext = path.suffix.lower()
-                if ext in [".safetensors", ".gguf"]:
+                if ext in MODEL_EXTENSIONS:
                     collected_files.append(path)
             elif path.is_dir():
                 # Check for index file
                 index_path = path / "model.safetensors.index.json"
-                if index_path.exists():
-                    # TODO: Parse index file to get list of files
-                    # For now, just scan directory
-                    pass
-                
-                # Scan directory
-                patterns = ["*.safetensors", "*.gguf"]
-                if recursive:
-                    patterns = [f"**/{p}" for p in patterns]
-                
-                for pattern in patterns:
-                    for f in path.glob(pattern):
-                        collected_files.append(f)
+                shards = _read_index_shards(index_path) if index_path.exists() else None
+
+                # Scan directory. An index only decides which of the
+                # directory's own .safetensors files are loaded; GGUF files
+                # and subdirectories are collected as usual.
+                for f in _iter_model_files(path, recursive):
+                    if (shards is not None and f.parent == path
+                            and f.name.lower().endswith(".safetensors") and f not in shards):
+                        continue
+                    collected_files.append(f)
     
     return sorted(list(set(collected_files)))
 
@@ -71,6 +109,22 @@ def main():
         action="store_true",
         help="Visualize model structure as an interactive sunburst chart"
     )
+    parser.add_argument(
+        "--max-depth",
+        type=_positive_int,
+        default=None,
+        help="Collapse tensor name components deeper than this into one node when visualizing"
+    )
+    parser.add_argument(
+        "--group-blocks",
+        action="store_true",
+        help="Merge numbered blocks (e.g. layers.0, layers.1) into one node when visualizing"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Cache visualization data and reuse it while the files are unchanged"
+    )
     
     args = parser.parse_args()
     
@@ -82,8 +136,12 @@ def main():
         
     if args.visualize:
         from .visualizer import visualize_model
-        visualize_model(files, args.paths)
+        visualize_model(
+            files, args.paths, max_depth=args.max_depth, group_repeated_blocks=args.group_blocks,
+            use_cache=args.cache,
+        )
     else:
+        from .app import SafetensorsExplorerApp
         app = SafetensorsExplorerApp(files)
         app.run()
 
@@ -1,22 +1,45 @@
 import re
-from dataclasses import dataclass
-from typing import List, Dict, Union, Optional
+import sys
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import List, Dict, Union, Optional, Tuple
 
-@dataclass
+from .utils import format_shape, format_size
+
+# Slotted dataclasses (Python 3.10+) drop the per-instance __dict__, which
+# matters with one TensorInfo and TreeNode per tensor
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class TensorInfo:
     name: str
     dtype: str
     shape: List[int]
     size_bytes: int
     num_elements: int
-
-@dataclass
+    # Display strings, formatted once instead of on every label render
+    formatted_shape: str = field(init=False, repr=False, compare=False)
+    formatted_size: str = field(init=False, repr=False, compare=False)
+    # Lowercased name for case-insensitive search
+    name_lower: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.formatted_shape = format_shape(self.shape)
+        self.formatted_size = format_size(self.size_bytes)
+        self.name_lower = self.name.lower()
+
+@dataclass(**_DATACLASS_OPTIONS)
 class MetadataInfo:
     name: str
     value: str
     value_type: str
+    # Lowercased name for case-insensitive search
+    name_lower: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.name_lower = self.name.lower()
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class TreeNode:
     name: str
     # If it's a group
@@ -28,6 +51,9 @@ class TreeNode:
     tensor_info: Optional[TensorInfo] = None
     # If it's metadata
     metadata_info: Optional[MetadataInfo] = None
+    # Lowercased names of every tensor/metadata entry in this subtree, used
+    # to skip whole branches while filtering
+    search_text: str = field(default="", repr=False)
 
     @property
     def is_group(self) -> bool:
@@ -41,15 +67,15 @@ class TreeNode:
     def is_metadata(self) -> bool:
         return self.metadata_info is not None
 
-def natural_sort_key(text: str) -> List[Union[str, int]]:
+_NATURAL_SORT_RE = re.compile(r'([0-9]+)')
+
+@lru_cache(maxsize=8192)
+def natural_sort_key(text: str) -> Tuple[Union[str, int], ...]:
     """
-    Splits the string into a list of text and numbers for natural sorting.
-    e.g., "layer10" -> ["layer", 10]
+    Splits the string into a tuple of text and numbers for natural sorting.
+    e.g., "layer10" -> ("layer", 10, "")
     """
-    def convert(text):
-        return int(text) if text.isdigit() else text.lower()
-    
-    return [convert(c) for c in re.split('([0-9]+)', text)]
+    return tuple(int(c) if c.isdigit() else c.lower() for c in _NATURAL_SORT_RE.split(text))
 
 class TreeBuilder:
     @staticmethod
@@ -62,7 +88,8 @@ class TreeBuilder:
             for meta in metadata:
                 metadata_children.append(TreeNode(
                     name=meta.name,
-                    metadata_info=meta
+                    metadata_info=meta,
+                    search_text=meta.name_lower
                 ))
             
             # Sort metadata by name
@@ -73,7 +100,8 @@ class TreeBuilder:
                 children=metadata_children,
                 expanded=False,
                 tensor_count=0,
-                total_size=0
+                total_size=0,
+                search_text=TreeBuilder.join_search_text(metadata_children)
             ))
 
         # Build tensor tree
@@ -84,93 +112,80 @@ class TreeBuilder:
 
     @staticmethod
     def build_tree(tensors: List[TensorInfo]) -> List[TreeNode]:
-        root_map: Dict[str, List[TensorInfo]] = {}
+        # Insert every tensor into a trie keyed by name component in one pass.
+        # Each trie node is a (groups, direct_tensors) pair so a name can be
+        # both a tensor and the prefix of other tensors.
+        root: Tuple[Dict[str, tuple], List[TensorInfo]] = ({}, [])
 
         for tensor in tensors:
             parts = tensor.name.split('.')
-            if len(parts) > 1:
-                prefix = parts[0]
-                if prefix not in root_map:
-                    root_map[prefix] = []
-                root_map[prefix].append(tensor)
-            else:
-                if "_root" not in root_map:
-                    root_map["_root"] = []
-                root_map["_root"].append(tensor)
-
-        tree = []
-        for prefix, group_tensors in root_map.items():
-            if prefix == "_root":
-                for tensor in group_tensors:
-                    tree.append(TreeNode(
-                        name=tensor.name,
-                        tensor_info=tensor
-                    ))
-            else:
-                # Sort tensors within the group
-                group_tensors.sort(key=lambda x: natural_sort_key(x.name))
-                
-                tensor_count = len(group_tensors)
-                total_size = sum(t.size_bytes for t in group_tensors)
-                
-                children = TreeBuilder.build_subtree(group_tensors, prefix)
-                
-                tree.append(TreeNode(
-                    name=prefix,
-                    children=children,
-                    expanded=True,
-                    tensor_count=tensor_count,
-                    total_size=total_size
-                ))
+            groups, direct_tensors = root
+            for part in parts[:-1]:
+                groups, direct_tensors = groups.setdefault(part, ({}, []))
+            direct_tensors.append(tensor)
 
-        # Sort root nodes
-        tree.sort(key=lambda x: natural_sort_key(x.name))
-        return tree
+        return TreeBuilder.build_nodes(root, expanded=True)
 
     @staticmethod
-    def build_subtree(tensors: List[TensorInfo], prefix: str) -> List[TreeNode]:
-        groups: Dict[str, List[TensorInfo]] = {}
-        direct_tensors: List[TensorInfo] = []
-
-        for tensor in tensors:
-            # Remove prefix + dot
-            if tensor.name.startswith(prefix + "."):
-                remaining = tensor.name[len(prefix) + 1:]
-            else:
-                remaining = tensor.name
-
-            parts = remaining.split('.')
-            
-            if len(parts) == 1:
-                direct_tensors.append(tensor)
-            else:
-                next_prefix = parts[0]
-                if next_prefix not in groups:
-                    groups[next_prefix] = []
-                groups[next_prefix].append(tensor)
+    def build_nodes(trie: Tuple[Dict[str, tuple], List[TensorInfo]], expanded: bool = False) -> List[TreeNode]:
+        groups, direct_tensors = trie
 
         result = []
-
         for tensor in direct_tensors:
             result.append(TreeNode(
                 name=tensor.name,
-                tensor_info=tensor
+                tensor_info=tensor,
+                search_text=tensor.name_lower
             ))
 
-        for group_name, group_tensors in groups.items():
-            tensor_count = len(group_tensors)
-            total_size = sum(t.size_bytes for t in group_tensors)
-            full_prefix = f"{prefix}.{group_name}"
-            
-            children = TreeBuilder.build_subtree(group_tensors, full_prefix)
-            
-            result.append(TreeNode(
-                name=group_name,
-                children=children,
-                expanded=False,
-                tensor_count=tensor_count,
-                total_size=total_size
-            ))
+        for group_name, subtrie in groups.items():
+            children = TreeBuilder.build_nodes(subtrie)
+            result.append(TreeBuilder.make_group(group_name, children, expanded))
 
         result.sort(key=lambda x: natural_sort_key(x.name))
         return result
+
+    @staticmethod
+    def make_group(name: str, children: List[TreeNode], expanded: bool) -> TreeNode:
+        # Roll up totals from already built children
+        tensor_count = 0
+        total_size = 0
+        for child in children:
+            if child.is_group:
+                tensor_count += child.tensor_count
+                total_size += child.total_size
+            elif child.is_tensor:
+                tensor_count += 1
+                total_size += child.tensor_info.size_bytes
+
+        return TreeNode(
+            name=name,
+            children=children,
+            expanded=expanded,
+            tensor_count=tensor_count,
+            total_size=total_size,
+            search_text=TreeBuilder.join_search_text(children)
+        )
+
+    @staticmethod
+    def join_search_text(children: List[TreeNode]) -> str:
+        # Newlines never appear in a search query, so matches can't span names
+        return "\n".join(child.search_text for child in children)
+
+    @staticmethod
+    def filter_tree(nodes: List[TreeNode], filter_text: str) -> List[TreeNode]:
+        """
+        Returns the subset of an already built tree whose tensor or metadata
+        names contain the lowercased filter_text. Leaf nodes are shared with
+        the input tree; only groups on a matching path are rebuilt.
+        """
+        result = []
+        for node in nodes:
+            if filter_text not in node.search_text:
+                continue
+            if node.is_group:
+                children = TreeBuilder.filter_tree(node.children, filter_text)
+                result.append(TreeBuilder.make_group(node.name, children, node.expanded))
+            else:
+                result.append(node)
+        return result
@@ -1,23 +1,23 @@
+from functools import lru_cache
 from typing import List
 
 def format_shape(shape: List[int]) -> str:
     """Format a tensor shape as a string."""
     return f"({', '.join(map(str, shape))})"
 
+_SIZE_UNITS = ["B", "KB", "MB", "GB"]
+
+# Tensors in repeated blocks share a handful of sizes, so this is mostly hits
+@lru_cache(maxsize=2048)
 def format_size(size_bytes: int) -> str:
     """Format a byte size into human-readable units."""
-    units = ["B", "KB", "MB", "GB"]
-    size = float(size_bytes)
-    unit_idx = 0
-
-    while size >= 1024.0 and unit_idx < len(units) - 1:
-        size /= 1024.0
-        unit_idx += 1
+    size_bytes = int(size_bytes)
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
 
-    if unit_idx == 0:
-        return f"{int(size)} {units[unit_idx]}"
-    else:
-        return f"{size:.1f} {units[unit_idx]}"
+    # Each unit is 2**10 times the previous one
+    unit_idx = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (unit_idx * 10)):.1f} {_SIZE_UNITS[unit_idx]}"
 
 def format_parameters(params: int) -> str:
     """Format a parameter count into human-readable units (K, M, B)."""
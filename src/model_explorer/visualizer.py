@@ -1,10 +1,11 @@
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from typing import List, Dict
+import os
+import re
+import json
+import hashlib
+from typing import List, Dict, Optional
 from pathlib import Path
 from .loader import ModelLoader
+from .tree import TensorInfo, MetadataInfo
 from .utils import format_size
 
 # Color definitions
@@ -35,165 +36,190 @@ LEGEND_INFO = [
     ("GROUP", COLORS["DEFAULT"], "Layer Group / Other"),
 ]
 
+# Tensor name patterns for each color category, in priority order
+LAYER_PATTERNS = {
+    "ENTRY": ["token_embd.weight", "embed_tokens.weight"],
+    "BLOCK_START": ["attn_norm.weight", "input_layernorm.weight"],
+    "ATTN_QKV": ["attn_q.weight", "attn_k.weight", "attn_v.weight",
+                 "self_attn.q_proj.weight", "self_attn.k_proj.weight", "self_attn.v_proj.weight"],
+    "ATTN_OUT": ["attn_output.weight", "self_attn.o_proj.weight"],
+    "MID_BLOCK": ["ffn_norm.weight", "post_attention_layernorm.weight"],
+    "MLP_GATE_UP": ["ffn_gate.weight", "ffn_up.weight", "mlp.gate_proj.weight", "mlp.up_proj.weight"],
+    "MLP_DOWN": ["ffn_down.weight", "mlp.down_proj.weight"],
+    "EXIT_NORM": ["output_norm.weight", "model.norm.weight"],
+    "EXIT_HEAD": ["output.weight", "lm_head.weight"],
+}
+
+# One alternation with a named group per category, so a name is scanned once.
+# Patterns matching at the same position resolve in LAYER_PATTERNS order.
+_LAYER_COLOR_RE = re.compile(
+    "|".join(
+        f"(?P<{category}>{'|'.join(re.escape(p) for p in patterns)})"
+        for category, patterns in LAYER_PATTERNS.items()
+    ),
+    re.IGNORECASE
+)
+
 def get_layer_color(name: str) -> str:
     """
     Determines the color of a layer based on its name using GGUF and Safetensors patterns.
     """
-    n = name.lower()
-    
-    # ENTRY
-    if "token_embd.weight" in n or "embed_tokens.weight" in n:
-        return COLORS["ENTRY"]
-        
-    # BLOCK START (Norm)
-    if "attn_norm.weight" in n or "input_layernorm.weight" in n:
-        return COLORS["BLOCK_START"]
-        
-    # ATTENTION (Q/K/V)
-    if any(x in n for x in ["attn_q.weight", "attn_k.weight", "attn_v.weight", 
-                           "self_attn.q_proj.weight", "self_attn.k_proj.weight", "self_attn.v_proj.weight"]):
-        return COLORS["ATTN_QKV"]
-        
-    # ATTENTION (Out)
-    if "attn_output.weight" in n or "self_attn.o_proj.weight" in n:
-        return COLORS["ATTN_OUT"]
-        
-    # MID-BLOCK (Norm)
-    if "ffn_norm.weight" in n or "post_attention_layernorm.weight" in n:
-        return COLORS["MID_BLOCK"]
-        
-    # MLP (Gate/Up)
-    if any(x in n for x in ["ffn_gate.weight", "ffn_up.weight", 
-                           "mlp.gate_proj.weight", "mlp.up_proj.weight"]):
-        return COLORS["MLP_GATE_UP"]
-        
-    # MLP (Down)
-    if "ffn_down.weight" in n or "mlp.down_proj.weight" in n:
-        return COLORS["MLP_DOWN"]
-        
-    # EXIT (Norm)
-    if "output_norm.weight" in n or "model.norm.weight" in n:
-        return COLORS["EXIT_NORM"]
-        
-    # EXIT (Head)
-    if "output.weight" in n or "lm_head.weight" in n:
-        return COLORS["EXIT_HEAD"]
-        
-    return COLORS["DEFAULT"]
+    match = _LAYER_COLOR_RE.search(name)
+    return COLORS[match.lastgroup] if match else COLORS["DEFAULT"]
 
-def visualize_model(files: List[Path], input_paths: List[str] = None):
+def get_layer_colors(names: List[str]) -> List[str]:
     """
-    Visualizes the model structure as an interactive sunburst chart with metadata inset.
+    Determines the colors of many layers at once, equivalent to calling
+    get_layer_color on each name.
     """
-    print(f"Loading {len(files)} file(s) for visualization...")
-    loader = ModelLoader(files)
-    loader.load()
-    
-    if not loader.tensors:
-        print("No tensors found to visualize.")
-        return
+    search = _LAYER_COLOR_RE.search
+    default = COLORS["DEFAULT"]
+    return [COLORS[match.lastgroup] if match else default for match in map(search, names)]
 
-    total_tensors = len(loader.tensors)
-    print(f"Found {total_tensors} tensors. Preparing visualization...")
+class _HierarchyNode:
+    """A node in the tensor name trie used to build the sunburst."""
+    __slots__ = ("children", "count", "size", "tensor", "mixed")
 
-    # ... (rest of the function)
+    def __init__(self):
+        self.children: Dict[str, "_HierarchyNode"] = {}
+        self.count = 0
+        self.size = 0
+        # First tensor stored on this node
+        self.tensor: Optional[TensorInfo] = None
+        # True once the node merges tensors that can't be described by the
+        # first one (different kinds or shapes)
+        self.mixed = False
 
-    # Construct title
-    path_str = " ".join(input_paths) if input_paths else "Model"
-    title = f"Model Structure<br>{path_str} ({total_tensors} tensors)"
+    def roll_up(self) -> None:
+        """Add every descendant's tensor count and size to its ancestors."""
+        for child in self.children.values():
+            child.roll_up()
+            self.count += child.count
+            self.size += child.size
 
+# Name of the node that collects tensors nested deeper than max_depth
+TRUNCATED_NODE_NAME = "..."
+# Name component that replaces numeric block indices when grouping blocks
+GROUPED_BLOCK_NAME = "*"
 
-    
-    # 1. Calculate tensor counts for every node in the hierarchy
-    node_counts: Dict[str, int] = {}
-    node_counts["root"] = 0
-    
-    all_node_ids = {"root"}
-    
-    for tensor in loader.tensors:
+def _tensor_hover_text(part: str, node: _HierarchyNode) -> str:
+    tensor = node.tensor
+    if node.count == 1:
+        return f"{tensor.name}<br>Shape: {tensor.shape}<br>Type: {tensor.dtype}<br>Size: {tensor.formatted_size}"
+    if node.mixed:
+        # Truncation by max_depth merges tensors of different kinds and
+        # shapes, so no single shape or dtype describes them
+        return f"{part} x {node.count}<br>Size: {format_size(node.size)}"
+    # The same tensor merged across blocks by group_repeated_blocks
+    return f"{part} x {node.count}<br>Shape: {tensor.shape}<br>Type: {tensor.dtype}<br>Size: {format_size(node.size)}"
+
+def _build_sunburst_records(
+    tensors: List[TensorInfo],
+    max_depth: Optional[int] = None,
+    group_repeated_blocks: bool = False,
+) -> Dict[str, list]:
+    """
+    Builds the sunburst hierarchy for the given tensors as parallel columns
+    (ids, parents, labels, values, colors, hover_texts), one entry per node.
+    """
+    # 1. Insert every tensor into a trie keyed by name component. Counts and
+    # sizes are recorded on the tensor's own node only, then rolled up once
+    # per trie node instead of once per name component of every tensor.
+    root = _HierarchyNode()
+    zero_size_count = 0
+    for tensor in tensors:
+        if tensor.size_bytes == 0:
+            zero_size_count += 1
         parts = tensor.name.split(".")
-        current_path = "root"
-        node_counts["root"] += 1
-        
+        if group_repeated_blocks:
+            parts = [GROUPED_BLOCK_NAME if part.isdigit() else part for part in parts]
+        truncated = max_depth is not None and len(parts) > max_depth
+        if truncated:
+            parts = parts[:max_depth] + [TRUNCATED_NODE_NAME]
+
+        node = root
         for part in parts:
-            node_id = f"{current_path}.{part}"
-            all_node_ids.add(node_id)
-            node_counts[node_id] = node_counts.get(node_id, 0) + 1
-            current_path = node_id
-
-    # 2. Prepare data for DataFrame
-    data = []
-    created_groups = set()
-    
-    # Add root node explicitly
-    data.append({
-        "id": "root",
-        "parent": "",
-        "name": f"Model ({node_counts['root']})",
-        "value": 0,
-        "color": COLORS["DEFAULT"],
-        "is_tensor": False
-    })
-    created_groups.add("root")
-    
-    for tensor in loader.tensors:
-        parts = tensor.name.split(".")
-        current_path = "root"
-        
-        for i, part in enumerate(parts):
-            node_id = f"{current_path}.{part}"
-            parent_id = current_path
-            
-            if node_id not in created_groups:
-                is_leaf = (i == len(parts) - 1)
-                count = node_counts[node_id]
-                display_name = f"{part} ({count})"
-                
-                if is_leaf:
-                    size_fmt = format_size(tensor.size_bytes)
-                    # Determine color based on full tensor name
-                    color = get_layer_color(tensor.name)
-                    
-                    data.append({
-                        "id": node_id,
-                        "parent": parent_id,
-                        "name": display_name,
-                        "value": tensor.size_bytes,
-                        "color": color,
-                        "is_tensor": True,
-                        "hover_text": f"{tensor.name}<br>Shape: {tensor.shape}<br>Type: {tensor.dtype}<br>Size: {size_fmt}"
-                    })
-                else:
-                    # Group node - use default grey
-                    data.append({
-                        "id": node_id,
-                        "parent": parent_id,
-                        "name": display_name,
-                        "value": 0,
-                        "color": COLORS["DEFAULT"],
-                        "is_tensor": False,
-                        "hover_text": f"Group: {part}<br>Tensors: {count}"
-                    })
-                created_groups.add(node_id)
-            
-            current_path = node_id
-
-    df = pd.DataFrame(data)
-    
-    # Create Sunburst Figure
-    sunburst_fig = px.sunburst(
-        df,
-        names='name',
-        parents='parent',
-        ids='id',
-        values='value',
-        hover_name='name',
-        hover_data={'hover_text': True, 'value': False, 'id': False, 'parent': False, 'name': False, 'color': False},
-    )
-    
-    # Apply colors manually since we have specific hex codes per node
-    sunburst_fig.update_traces(marker=dict(colors=df['color']))
-    
+            children = node.children
+            node = children.get(part)
+            if node is None:
+                node = children[part] = _HierarchyNode()
+        if node.tensor is None:
+            node.tensor = tensor
+        elif truncated or tensor.shape != node.tensor.shape or tensor.dtype != node.tensor.dtype:
+            # Truncation merges unrelated tensors; grouped blocks only merge
+            # the same tensor across blocks
+            node.mixed = True
+        node.count += 1
+        node.size += tensor.size_bytes
+    root.roll_up()
+
+    # 2. Walk the trie once to fill parallel arrays for the sunburst trace.
+    # Node ids are indices into these arrays; plotly only needs them unique.
+    ids = ["0"]
+    parents = [""]
+    labels = [f"Model ({root.count})"]
+    # Every node carries its subtree size so plotly can use
+    # branchvalues="total" without summing children itself
+    values = [root.size]
+    colors = [COLORS["DEFAULT"]]
+    hover_texts = [f"Group: Model<br>Tensors: {root.count}"]
+    if zero_size_count:
+        hover_texts[0] += f"<br>Zero-size tensors (not drawn): {zero_size_count}"
+    # Tensor nodes and their positions, described in one batch after the walk
+    leaf_positions = []
+    leaf_nodes = []
+
+    stack = [("0", root)]
+    while stack:
+        parent_id, parent = stack.pop()
+        for part, node in parent.children.items():
+            # Zero-size subtrees have no area to draw, so skip their arcs.
+            # Their tensors still count towards the group labels above.
+            if node.size == 0:
+                continue
+            node_id = str(len(ids))
+            ids.append(node_id)
+            parents.append(parent_id)
+            labels.append(f"{part} ({node.count})")
+            values.append(node.size)
+
+            if node.tensor is not None and not node.children:
+                leaf_positions.append(len(colors))
+                leaf_nodes.append((part, node))
+                colors.append(COLORS["DEFAULT"])
+                hover_texts.append("")
+            else:
+                # Group node - use default grey
+                colors.append(COLORS["DEFAULT"])
+                hover_texts.append(f"Group: {part}<br>Tensors: {node.count}")
+                stack.append((node_id, node))
+
+    # Determine tensor colors based on full tensor names, and describe each
+    # tensor node
+    leaf_colors = get_layer_colors([node.tensor.name for _, node in leaf_nodes])
+    for position, (part, node), color in zip(leaf_positions, leaf_nodes, leaf_colors):
+        colors[position] = COLORS["DEFAULT"] if node.mixed else color
+        hover_texts[position] = _tensor_hover_text(part, node)
+
+    return {
+        "ids": ids,
+        "parents": parents,
+        "labels": labels,
+        "values": values,
+        "colors": colors,
+        "hover_texts": hover_texts,
+    }
+
+def _render(records: Dict[str, list], metadata: List[MetadataInfo], title: str):
+    """
+    Lays out the sunburst built from records next to the metadata and legend
+    tables, and returns the plotly figure.
+    """
+    # Plotting libraries are slow to import, so only load them when needed
+    import numpy as np
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     # Create main figure with subplots
     # 2 rows, 2 columns. 
     # Left column (Sunburst) spans both rows.
@@ -210,15 +236,26 @@ def visualize_model(files: List[Path], input_paths: List[str] = None):
     )
     
     # Add Sunburst trace
-    for trace in sunburst_fig.data:
-        trace.hovertemplate = "<b>%{label}</b><br>%{customdata[0]}<extra></extra>"
-        trace.textinfo = "label+percent entry"
-        fig.add_trace(trace, row=1, col=1)
+    fig.add_trace(
+        go.Sunburst(
+            ids=records["ids"],
+            parents=records["parents"],
+            labels=records["labels"],
+            # A typed array lets plotly encode the sizes as binary
+            values=np.asarray(records["values"], dtype=np.int64),
+            branchvalues="total",
+            marker=dict(colors=records["colors"]),
+            customdata=records["hover_texts"],
+            hovertemplate="<b>%{label}</b><br>%{customdata}<extra></extra>",
+            textinfo="label+percent entry",
+        ),
+        row=1, col=1
+    )
 
     # Add Metadata Table trace
-    if loader.metadata:
-        meta_names = [m.name for m in loader.metadata]
-        meta_values = [m.value for m in loader.metadata]
+    if metadata:
+        meta_names = [m.name for m in metadata]
+        meta_values = [m.value for m in metadata]
         
         fig.add_trace(
             go.Table(
@@ -275,5 +312,157 @@ def visualize_model(files: List[Path], input_paths: List[str] = None):
         margin=dict(t=60, l=10, r=10, b=10),
     )
 
+    return fig
+
+# Bump when the layout or contents of cached visualization data change
+CACHE_FORMAT_VERSION = 3
+# Only the most recently used cache entries are kept
+MAX_CACHE_ENTRIES = 16
+# Columns returned by _build_sunburst_records
+_RECORD_COLUMNS = ("ids", "parents", "labels", "values", "colors", "hover_texts")
+
+def _cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "model_explorer"
+
+def _cache_key(files: List[Path], max_depth: Optional[int], group_repeated_blocks: bool) -> Optional[str]:
+    """
+    Hashes the cache format version, visualization options and each file's
+    path, modification time and size, so editing or replacing a file misses
+    the cache.
+    """
+    digest = hashlib.sha1(f"{CACHE_FORMAT_VERSION}:{max_depth}:{group_repeated_blocks}".encode())
+    for file_path in files:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        digest.update(f"\n{os.path.abspath(file_path)}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return digest.hexdigest()
+
+def _is_valid_cache_entry(entry) -> bool:
+    """Checks that a cache entry has the layout visualize_model stores."""
+    if not isinstance(entry, dict) or not isinstance(entry.get("total_tensors"), int):
+        return False
+    records = entry.get("records")
+    if not isinstance(records, dict) or set(records) != set(_RECORD_COLUMNS):
+        return False
+    columns = list(records.values())
+    if not all(isinstance(column, list) for column in columns) or len({len(c) for c in columns}) != 1:
+        return False
+    metadata = entry.get("metadata")
+    return isinstance(metadata, list) and all(
+        isinstance(m, list) and len(m) == 3 and all(isinstance(v, str) for v in m)
+        for m in metadata
+    )
+
+def _load_cached(key: str) -> Optional[dict]:
+    path = _cache_dir() / f"{key}.json"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Anything else, e.g. a truncated or hand-edited file, is a miss
+    if not _is_valid_cache_entry(entry):
+        return None
+    try:
+        # Mark the entry as recently used so eviction keeps it
+        os.utime(path)
+    except OSError:
+        pass
+    return entry
+
+def _evict_cached(cache_dir: Path) -> None:
+    # Another run may evict or replace entries concurrently, so files that
+    # vanish or can't be removed are skipped rather than aborting eviction
+    entries = []
+    for path in cache_dir.glob("*.json"):
+        try:
+            entries.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    for _, path in entries[MAX_CACHE_ENTRIES:]:
+        try:
+            path.unlink()
+        except OSError:
+            continue
+
+def _store_cached(key: str, entry: dict) -> None:
+    cache_dir = _cache_dir()
+    # Write then rename so a concurrent run never reads a partial file
+    tmp_path = cache_dir / f"{key}.{os.getpid()}.tmp"
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, cache_dir / f"{key}.json")
+    except (OSError, TypeError, ValueError) as e:
+        # The cache is only an optimization; never let it break the chart
+        print(f"Warning: could not write visualization cache: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return
+    _evict_cached(cache_dir)
+
+def visualize_model(
+    files: List[Path],
+    input_paths: List[str] = None,
+    max_depth: Optional[int] = None,
+    group_repeated_blocks: bool = False,
+    use_cache: bool = False,
+):
+    """
+    Visualizes the model structure as an interactive sunburst chart with metadata inset.
+
+    Large models produce tens of thousands of arcs, which is slow to render.
+    max_depth collapses name components past that depth into a single node,
+    and group_repeated_blocks merges numbered blocks (layers.0, layers.1, ...)
+    into one layers.* node.
+
+    With use_cache, the sunburst data is cached under
+    $XDG_CACHE_HOME/model_explorer (default ~/.cache/model_explorer), keyed
+    by the files' paths, modification times and sizes, so rerunning on
+    unchanged files skips loading them.
+    """
+    key = _cache_key(files, max_depth, group_repeated_blocks) if use_cache else None
+    cached = _load_cached(key) if key else None
+
+    if cached is not None:
+        total_tensors = cached["total_tensors"]
+        records = cached["records"]
+        metadata = [MetadataInfo(*m) for m in cached["metadata"]]
+        print(f"Found {total_tensors} tensors in cache. Preparing visualization...")
+    else:
+        print(f"Loading {len(files)} file(s) for visualization...")
+        loader = ModelLoader(files)
+        loader.load()
+
+        if not loader.tensors:
+            print("No tensors found to visualize.")
+            return
+
+        total_tensors = len(loader.tensors)
+        print(f"Found {total_tensors} tensors. Preparing visualization...")
+
+        records = _build_sunburst_records(loader.tensors, max_depth, group_repeated_blocks)
+        metadata = loader.metadata
+        if key:
+            _store_cached(key, {
+                "total_tensors": total_tensors,
+                # Sizes may come from numpy integers, which json can't encode
+                "records": {**records, "values": [int(v) for v in records["values"]]},
+                "metadata": [[m.name, m.value, m.value_type] for m in metadata],
+            })
+
+    # Construct title
+    path_str = " ".join(input_paths) if input_paths else "Model"
+    title = f"Model Structure<br>{path_str} ({total_tensors} tensors)"
+
+    fig = _render(records, metadata, title)
+
     print("Opening visualization in browser...")
     fig.show()
@@ -1,15 +1,15 @@
-import torch
 import sys
-from safetensors.torch import save_file
+import numpy as np
+from safetensors.numpy import save_file
 
 
 def create_safetensors(path):
     tensors = {
-        "model.layers.0.weight": torch.zeros((10, 10)),
-        "model.layers.0.bias": torch.zeros((10)),
-        "model.layers.1.weight": torch.zeros((10, 10)),
-        "model.layers.1.bias": torch.zeros((10)),
-        "model.embed_tokens.weight": torch.zeros((100, 10)),
+        "model.layers.0.weight": np.zeros((10, 10), dtype=np.float32),
+        "model.layers.0.bias": np.zeros((10,), dtype=np.float32),
+        "model.layers.1.weight": np.zeros((10, 10), dtype=np.float32),
+        "model.layers.1.bias": np.zeros((10,), dtype=np.float32),
+        "model.embed_tokens.weight": np.zeros((100, 10), dtype=np.float32),
     }
 
     metadata = {
@@ -1,4 +1,5 @@
 import unittest
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -20,8 +21,11 @@ class TestModelExplorer(unittest.TestCase):
         cls.safetensors_path = Path(__file__).parent / "test_model.safetensors"
         cls.gguf_path = Path(__file__).parent / "test_model.gguf"
 
-        # Create sample model files
-        create_safetensors(str(cls.safetensors_path))
+        # Create sample model files. The safetensors fixture is committed and
+        # only regenerated when missing: the writer orders metadata keys
+        # differently from run to run, which would dirty the checkout.
+        if not cls.safetensors_path.exists():
+            create_safetensors(str(cls.safetensors_path))
         create_gguf(str(cls.gguf_path))
 
     @classmethod
@@ -49,6 +53,43 @@ class TestModelExplorer(unittest.TestCase):
         self.assertIsNotNone(first_tensor.dtype)
         self.assertIsNotNone(first_tensor.shape)
 
+    def test_safetensors_header_sizes(self):
+        """Test that tensor sizes come from the safetensors header offsets."""
+        app = SafetensorsExplorerApp(files=[self.safetensors_path])
+        app.load_files()
+
+        embed = next(t for t in app.tensors if t.name == "model.embed_tokens.weight")
+        self.assertEqual(embed.dtype, "F32")
+        self.assertEqual(embed.shape, [100, 10])
+        self.assertEqual(embed.num_elements, 1000)
+        self.assertEqual(embed.size_bytes, 4000)
+
+        metadata = {m.name: m.value for m in app.metadata}
+        self.assertEqual(metadata.get("arch"), "llama")
+
+        # 100*10 + 10 + 10*10 + 10 + 10*10
+        self.assertEqual(app.total_parameters, 1220)
+
+    def test_safetensors_size_without_offsets(self):
+        """Test the dtype table fallback for header entries without data_offsets."""
+        import json
+        import struct
+        from model_explorer.loader import ModelLoader
+
+        path = Path(__file__).parent / "test_no_offsets.safetensors"
+        header = json.dumps({
+            "a": {"dtype": "BF16", "shape": [4, 4]},
+            "b": {"dtype": "I16", "shape": [3]},
+        }).encode()
+        path.write_bytes(struct.pack("<Q", len(header)) + header)
+        try:
+            tensors, _ = ModelLoader.load_safetensors_file(path)
+        finally:
+            os.remove(path)
+
+        sizes = {t.name: t.size_bytes for t in tensors}
+        self.assertEqual(sizes, {"a": 32, "b": 6})
+
     def test_load_gguf(self):
         """Test loading a GGUF file."""
         if not self.gguf_path.exists():
@@ -65,6 +106,30 @@ class TestModelExplorer(unittest.TestCase):
         
         tensor1 = next(t for t in app.tensors if t.name == "tensor1")
         self.assertEqual(tensor1.shape, [10, 10])
+        self.assertEqual(tensor1.num_elements, 100)
+        self.assertIs(type(tensor1.num_elements), int)
+        self.assertEqual(tensor1.size_bytes, 400)
+        self.assertIs(type(tensor1.size_bytes), int)
+
+    def test_gguf_array_metadata_is_summarized(self):
+        """Test that array-valued GGUF fields are summarized, not stringified."""
+        import gguf
+        from model_explorer.loader import _format_gguf_field
+
+        path = Path(__file__).parent / "test_array.gguf"
+        writer = gguf.GGUFWriter(str(path), "llama")
+        writer.add_token_list(["a", "bb", "ccc"])
+        writer.add_tensor("tensor1", np.ones((2, 2), dtype=np.float32))
+        writer.write_header_to_file()
+        writer.write_kv_data_to_file()
+        writer.write_tensors_to_file()
+        writer.close()
+        try:
+            reader = gguf.GGUFReader(str(path))
+            field = reader.fields["tokenizer.ggml.tokens"]
+            self.assertEqual(_format_gguf_field(field), "<array: 3 items, type=STRING>")
+        finally:
+            os.remove(path)
 
     def test_mixed_loading(self):
         """Test loading both types together."""
@@ -77,6 +142,75 @@ class TestModelExplorer(unittest.TestCase):
         self.assertTrue(len(app.tensors) > 0)
         # Should have tensors from both (unless names collide, but here they shouldn't)
         # Note: app dedupes by name, so if both have "tensor1", only one appears.
-        
+
+    def test_filter_nodes_incremental(self):
+        """Test that narrowing the search reuses and refines previous matches."""
+        app = SafetensorsExplorerApp(files=[self.safetensors_path])
+        app.load_files()
+
+        nodes = app.filter_nodes("layers")
+        self.assertEqual(nodes[0].name, "model")
+        self.assertEqual(nodes[0].tensor_count, 4)
+
+        nodes = app.filter_nodes("layers.1")
+        self.assertEqual(nodes[0].tensor_count, 2)
+
+        self.assertIs(app.filter_nodes(""), app.root_nodes)
+
+    def test_tree_widget_matches_tree(self):
+        """Test that the tree widget mirrors the built tree in sorted order."""
+        from textual.widgets import Tree
+
+        def labels(node, depth=0):
+            result = []
+            for child in node.children:
+                result.append("  " * depth + str(child.label))
+                result.extend(labels(child, depth + 1))
+            return result
+
+        async def run():
+            app = SafetensorsExplorerApp(files=[self.safetensors_path])
+            async with app.run_test():
+                return labels(app.query_one("#file-tree", Tree).root)
+
+        tree_labels = asyncio.run(run())
+        self.assertEqual(tree_labels[:4], [
+            "📁 🔧 Metadata (0 tensors, 0 B)",
+            "  🏷️ arch: llama",
+            "  🏷️ format: pt",
+            "📁 model (5 tensors, 4.8 KB)",
+        ])
+        self.assertEqual(tree_labels[7:9], ["    📁 0 (2 tensors, 440 B)", "      📄 bias [F32, (10), 40 B]"])
+        self.assertEqual(len(tree_labels), 13)
+
+    def test_search_is_debounced(self):
+        """Test that typing a query rebuilds the tree once it settles."""
+        from textual.widgets import Tree
+
+        async def run():
+            app = SafetensorsExplorerApp(files=[self.safetensors_path])
+            async with app.run_test() as pilot:
+                builds = []
+                build_tree = app.build_tree
+                app.build_tree = lambda filter_text="": (builds.append(filter_text), build_tree(filter_text))
+
+                await pilot.press("/", *"layers.1")
+                await pilot.pause(app.SEARCH_DEBOUNCE_SECONDS * 5)
+                root = app.query_one("#file-tree", Tree).root
+                return builds, [str(child.label) for child in root.children]
+
+        builds, top_labels = asyncio.run(run())
+        self.assertEqual(builds[-1], "layers.1")
+        self.assertLess(len(builds), len("layers.1"))
+        self.assertEqual(top_labels, ["📁 model (2 tensors, 440 B)"])
+
+    def test_parallel_load_keeps_file_order(self):
+        """Test that concurrently loaded files are merged in input order."""
+        app = SafetensorsExplorerApp(files=[self.gguf_path, self.safetensors_path])
+        app.load_files()
+
+        self.assertEqual(app.tensors[0].name, "tensor1")
+        self.assertIn("model.embed_tokens.weight", [t.name for t in app.tensors[1:]])
+
 if __name__ == '__main__':
     unittest.main()
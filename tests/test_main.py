@@ -0,0 +1,88 @@
+import unittest
+import json
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from model_explorer.main import collect_files, main
+
+class TestCollectFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for rel in ["a.safetensors", "b.gguf", "notes.txt", "sub/c.safetensors", "sub/deep/d.GGUF"]:
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def names(self, files):
+        return sorted(f.relative_to(self.root).as_posix() for f in files)
+
+    def test_directory(self):
+        files = collect_files([str(self.root)], recursive=False)
+        self.assertEqual(self.names(files), ["a.safetensors", "b.gguf"])
+
+    def test_directory_recursive(self):
+        files = collect_files([str(self.root)], recursive=True)
+        self.assertEqual(self.names(files), ["a.safetensors", "b.gguf", "sub/c.safetensors", "sub/deep/d.GGUF"])
+
+    def test_glob_and_literal_paths(self):
+        files = collect_files([str(self.root / "*.gguf"), str(self.root / "a.safetensors"), str(self.root / "missing.gguf")], recursive=False)
+        self.assertEqual(self.names(files), ["a.safetensors", "b.gguf"])
+
+    def test_literal_path_with_glob_characters(self):
+        """Test that an existing file whose name looks like a glob is still found."""
+        path = self.root / "m[v2].safetensors"
+        path.write_bytes(b"")
+        files = collect_files([str(path)], recursive=False)
+        self.assertEqual(self.names(files), ["m[v2].safetensors"])
+
+    def test_safetensors_index(self):
+        """Test that an index file selects its shards instead of scanning."""
+        model_dir = self.root / "model"
+        model_dir.mkdir()
+        for name in ["model-00001-of-00002.safetensors", "model-00002-of-00002.safetensors", "extra.safetensors"]:
+            (model_dir / name).write_bytes(b"")
+        index = {"weight_map": {
+            "a.weight": "model-00001-of-00002.safetensors",
+            "b.weight": "model-00002-of-00002.safetensors",
+            "c.weight": "model-00002-of-00002.safetensors",
+        }}
+        (model_dir / "model.safetensors.index.json").write_text(json.dumps(index))
+
+        files = collect_files([str(model_dir)], recursive=False)
+        self.assertEqual(self.names(files), ["model/model-00001-of-00002.safetensors", "model/model-00002-of-00002.safetensors"])
+
+    def test_safetensors_index_keeps_other_model_files(self):
+        """Test that an index only filters the directory's own safetensors files."""
+        index = {"weight_map": {"a.weight": "a.safetensors"}}
+        (self.root / "model.safetensors.index.json").write_text(json.dumps(index))
+        (self.root / "extra.safetensors").write_bytes(b"")
+
+        files = collect_files([str(self.root)], recursive=True)
+        self.assertEqual(self.names(files), ["a.safetensors", "b.gguf", "sub/c.safetensors", "sub/deep/d.GGUF"])
+
+    def test_invalid_safetensors_index_falls_back_to_scan(self):
+        for content in ["not json", '{"weight_map": []}', '{"weight_map": {"a": 1}}', '{"weight_map": {"a": "missing.safetensors"}}']:
+            (self.root / "model.safetensors.index.json").write_text(content)
+            files = collect_files([str(self.root)], recursive=False)
+            self.assertEqual(self.names(files), ["a.safetensors", "b.gguf"], content)
+
+class TestMain(unittest.TestCase):
+    def test_max_depth_must_be_positive(self):
+        for value in ["0", "-1"]:
+            with patch.object(sys, "argv", ["model-explorer", "-v", "--max-depth", value, "model.safetensors"]), \
+                    patch("sys.stderr"), self.assertRaises(SystemExit) as cm:
+                main()
+            self.assertEqual(cm.exception.code, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from model_explorer.tree import TreeBuilder, TensorInfo, MetadataInfo, natural_sort_key
+
+def make_tensor(name: str, size_bytes: int = 4) -> TensorInfo:
+    return TensorInfo(name=name, dtype="F32", shape=[size_bytes // 4], size_bytes=size_bytes, num_elements=size_bytes // 4)
+
+class TestTreeBuilder(unittest.TestCase):
+    def test_natural_sort_key(self):
+        """Test that numeric runs compare as numbers and keys are hashable."""
+        self.assertEqual(natural_sort_key("Layer10"), ("layer", 10, ""))
+        self.assertLess(natural_sort_key("layer2"), natural_sort_key("layer10"))
+        self.assertEqual(hash(natural_sort_key("a1")), hash(natural_sort_key("a1")))
+
+    @unittest.skipIf(sys.version_info < (3, 10), "slotted dataclasses need Python 3.10+")
+    def test_dataclasses_are_slotted(self):
+        tensor = make_tensor("a")
+        node = TreeBuilder.build_tree([tensor])[0]
+        self.assertFalse(hasattr(tensor, "__dict__"))
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertFalse(hasattr(MetadataInfo("k", "v", "string"), "__dict__"))
+        self.assertEqual(tensor.formatted_size, "4 B")
+
+    def test_build_tree_groups_and_totals(self):
+        """Test that groups are nested by name component with rolled-up totals."""
+        tensors = [
+            make_tensor("model.layers.10.weight", 40),
+            make_tensor("model.layers.2.weight", 20),
+            make_tensor("model.layers.2.bias", 8),
+            make_tensor("model.norm.weight", 4),
+            make_tensor("lm_head", 100),
+        ]
+        tree = TreeBuilder.build_tree(tensors)
+
+        self.assertEqual([n.name for n in tree], ["lm_head", "model"])
+        model = tree[1]
+        self.assertTrue(model.expanded)
+        self.assertEqual(model.tensor_count, 4)
+        self.assertEqual(model.total_size, 72)
+
+        layers = next(n for n in model.children if n.name == "layers")
+        self.assertFalse(layers.expanded)
+        # Natural sort puts layer 2 before layer 10
+        self.assertEqual([n.name for n in layers.children], ["2", "10"])
+        self.assertEqual(layers.children[0].tensor_count, 2)
+        self.assertEqual(layers.children[0].total_size, 28)
+
+    def test_build_tree_name_is_tensor_and_prefix(self):
+        """Test that a tensor name may also be the prefix of other tensors."""
+        tensors = [make_tensor("a.b"), make_tensor("a.b.c")]
+        tree = TreeBuilder.build_tree(tensors)
+
+        a = tree[0]
+        self.assertEqual(a.tensor_count, 2)
+        self.assertEqual(len(a.children), 2)
+        self.assertTrue(any(c.is_tensor and c.name == "a.b" for c in a.children))
+        self.assertTrue(any(c.is_group and c.name == "b" for c in a.children))
+
+    def test_filter_tree(self):
+        """Test that filtering keeps matching paths and recomputes totals."""
+        tensors = [
+            make_tensor("model.layers.0.q_proj.weight", 8),
+            make_tensor("model.layers.0.k_proj.weight", 8),
+            make_tensor("model.layers.1.q_proj.weight", 8),
+            make_tensor("lm_head.weight", 100),
+        ]
+        metadata = [MetadataInfo("general.Q_name", "x", "string")]
+        self.assertEqual(metadata[0].name_lower, "general.q_name")
+        tree = TreeBuilder.build_tree_mixed(tensors, metadata)
+
+        filtered = TreeBuilder.filter_tree(tree, "q_")
+        self.assertEqual([n.name for n in filtered], ["🔧 Metadata", "model"])
+        model = filtered[1]
+        self.assertEqual(model.tensor_count, 2)
+        self.assertEqual(model.total_size, 16)
+        self.assertEqual(filtered[0].tensor_count, 0)
+
+        # The unfiltered tree is left untouched
+        self.assertEqual(tree[-1].tensor_count, 3)
+        self.assertEqual(TreeBuilder.filter_tree(tree, "missing"), [])
+
+if __name__ == '__main__':
+    unittest.main()
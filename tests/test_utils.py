@@ -0,0 +1,30 @@
+import unittest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from model_explorer.utils import format_size, format_shape, format_parameters
+
+class TestUtils(unittest.TestCase):
+    def test_format_size(self):
+        """Test unit selection and rounding at unit boundaries."""
+        self.assertEqual(format_size(0), "0 B")
+        self.assertEqual(format_size(1023), "1023 B")
+        self.assertEqual(format_size(1024), "1.0 KB")
+        self.assertEqual(format_size(1536), "1.5 KB")
+        self.assertEqual(format_size(1024 ** 2 - 1), "1024.0 KB")
+        self.assertEqual(format_size(5 * 1024 ** 3), "5.0 GB")
+        # GB is the largest unit
+        self.assertEqual(format_size(2 * 1024 ** 4), "2048.0 GB")
+
+    def test_format_shape(self):
+        self.assertEqual(format_shape([10, 10]), "(10, 10)")
+
+    def test_format_parameters(self):
+        self.assertEqual(format_parameters(999), "999")
+        self.assertEqual(format_parameters(1_500_000), "1.5M")
+
+if __name__ == '__main__':
+    unittest.main()
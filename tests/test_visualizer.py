@@ -1,15 +1,48 @@
 import unittest
 from pathlib import Path
-import pandas as pd
+import subprocess
+import json
+import tempfile
 import sys
 import os
 
 # Add src to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from model_explorer.visualizer import visualize_model, get_layer_color, COLORS
+from model_explorer.visualizer import (
+    visualize_model, get_layer_color, get_layer_colors, _build_sunburst_records, COLORS, LEGEND_INFO,
+)
+from model_explorer.tree import TensorInfo
 from tests.create_test_safetensors import create_safetensors
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+
+def node_paths(ids, parents, labels):
+    """Resolve sunburst node ids to dotted paths of their labels."""
+    parent_of = dict(zip(ids, parents))
+    name_of = {i: label.rsplit(" (", 1)[0] for i, label in zip(ids, labels)}
+
+    def path(node_id):
+        parent = parent_of[node_id]
+        return f"{path(parent)}.{name_of[node_id]}" if parent else name_of[node_id]
+
+    return [path(i) for i in ids]
+
+def make_tensors():
+    """The tensors written by create_safetensors, without touching disk."""
+    shapes = {
+        "model.layers.0.weight": [10, 10],
+        "model.layers.0.bias": [10],
+        "model.layers.1.weight": [10, 10],
+        "model.layers.1.bias": [10],
+        "model.embed_tokens.weight": [100, 10],
+    }
+    tensors = []
+    for name, shape in shapes.items():
+        num_elements = 1
+        for dim in shape:
+            num_elements *= dim
+        tensors.append(TensorInfo(name, "F32", shape, num_elements * 4, num_elements))
+    return tensors
 
 class TestVisualizer(unittest.TestCase):
     @classmethod
@@ -17,9 +50,15 @@ class TestVisualizer(unittest.TestCase):
         cls.root_dir = Path(__file__).parent.parent
         cls.safetensors_path = cls.root_dir / "test_viz.safetensors"
         create_safetensors(str(cls.safetensors_path))
+        # Keep the visualization cache out of the user's home directory
+        cls.cache_home = tempfile.TemporaryDirectory()
+        cls.env_patch = patch.dict(os.environ, {"XDG_CACHE_HOME": cls.cache_home.name})
+        cls.env_patch.start()
 
     @classmethod
     def tearDownClass(cls):
+        cls.env_patch.stop()
+        cls.cache_home.cleanup()
         if cls.safetensors_path.exists():
             os.remove(cls.safetensors_path)
 
@@ -44,59 +83,210 @@ class TestVisualizer(unittest.TestCase):
         self.assertEqual(get_layer_color("model.norm.weight"), COLORS["EXIT_NORM"])
         self.assertEqual(get_layer_color("lm_head.weight"), COLORS["EXIT_HEAD"])
         
+        # GGUF names, including ones containing a lower priority pattern
+        self.assertEqual(get_layer_color("blk.0.attn_output.weight"), COLORS["ATTN_OUT"])
+        self.assertEqual(get_layer_color("blk.0.ffn_up.weight"), COLORS["MLP_GATE_UP"])
+        self.assertEqual(get_layer_color("output.weight"), COLORS["EXIT_HEAD"])
+        self.assertEqual(get_layer_color("LM_HEAD.weight"), COLORS["EXIT_HEAD"])
+        
         # Default
         self.assertEqual(get_layer_color("unknown.layer"), COLORS["DEFAULT"])
 
-    @patch('model_explorer.visualizer.make_subplots')
-    @patch('model_explorer.visualizer.px.sunburst')
-    @patch('model_explorer.visualizer.pd.DataFrame')
-    def test_visualize_model(self, mock_df, mock_sunburst, mock_subplots):
-        """Test that visualize_model calls plotly with correct data."""
-        
-        # Mock DataFrame to capture data passed to it
-        def side_effect(data):
-            # Verify data structure
-            self.assertIsInstance(data, list)
-            self.assertTrue(len(data) > 0)
-            
-            # Check for color attribute
-            tensors = [item for item in data if item.get("is_tensor")]
-            self.assertTrue(len(tensors) > 0)
-            self.assertIn("color", tensors[0])
-            
-            return MagicMock() # Return a mock DataFrame
-            
-        mock_df.side_effect = side_effect
-        
-        # Mock figures
-        mock_sunburst_fig = MagicMock()
-        mock_sunburst_fig.data = [MagicMock()] # One trace
-        mock_sunburst.return_value = mock_sunburst_fig
-        
-        mock_main_fig = MagicMock()
-        mock_subplots.return_value = mock_main_fig
-        
-        visualize_model([self.safetensors_path], ["test_viz.safetensors"])
-        
-        # Verify calls
-        self.assertTrue(mock_df.called)
-        self.assertTrue(mock_sunburst.called)
-        self.assertTrue(mock_subplots.called)
-        
-        # Verify make_subplots called with 2 rows
-        _, kwargs = mock_subplots.call_args
-        self.assertEqual(kwargs.get('rows'), 2)
-        self.assertEqual(kwargs.get('cols'), 2)
-        
-        # Verify traces added: Sunburst, Metadata, Legend
-        self.assertTrue(mock_main_fig.add_trace.called)
-        self.assertEqual(mock_main_fig.add_trace.call_count, 3)
-        
-        # Verify layout update with title
-        self.assertTrue(mock_main_fig.update_layout.called)
-        _, layout_kwargs = mock_main_fig.update_layout.call_args
-        self.assertIn("title_text", layout_kwargs)
-        self.assertIn("test_viz.safetensors", layout_kwargs["title_text"])
+    def test_import_does_not_load_plotly(self):
+        """Test that plotly is only imported once a visualization is requested."""
+        src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'))
+        code = (
+            f"import sys; sys.path.insert(0, {src_dir!r}); "
+            "import model_explorer.main, model_explorer.visualizer; "
+            "print(sorted(m for m in ('plotly', 'pandas', 'textual', 'gguf') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_get_layer_colors(self):
+        """Test that batch color mapping matches per-name mapping."""
+        names = ["model.embed_tokens.weight", "blk.0.attn_output.weight", "unknown.layer", "lm_head.weight"]
+        self.assertEqual(get_layer_colors(names), [get_layer_color(n) for n in names])
+        self.assertEqual(get_layer_colors([]), [])
+
+    def test_build_sunburst_records(self):
+        """Test that the sunburst records carry per-node colors and subtree sizes."""
+        records = _build_sunburst_records(make_tensors())
+
+        self.assertEqual(set(records), {"ids", "parents", "labels", "values", "colors", "hover_texts"})
+        self.assertEqual(len({len(column) for column in records.values()}), 1)
+        self.assertEqual(len(set(records["ids"])), len(records["ids"]))
+
+        paths = node_paths(records["ids"], records["parents"], records["labels"])
+        nodes = dict(zip(paths, zip(records["values"], records["colors"])))
+        self.assertEqual(nodes["Model"][0], 4880)
+        self.assertEqual(nodes["Model.model.layers"], (880, COLORS["DEFAULT"]))
+        self.assertEqual(nodes["Model.model.embed_tokens.weight"], (4000, COLORS["ENTRY"]))
+        self.assertEqual(records["labels"][0], "Model (5)")
+
+    def test_build_sunburst_records_depth_and_grouping(self):
+        """Test that deep names are truncated and numbered blocks merged."""
+        records = _build_sunburst_records(make_tensors(), max_depth=2, group_repeated_blocks=True)
+        paths = node_paths(records["ids"], records["parents"], records["labels"])
+        self.assertEqual(sorted(paths), [
+            "Model",
+            "Model.model",
+            "Model.model.embed_tokens",
+            "Model.model.embed_tokens....",
+            "Model.model.layers",
+            "Model.model.layers....",
+        ])
+        nodes = dict(zip(paths, records["values"]))
+        self.assertEqual(nodes["Model.model.layers...."], 880)
+
+        records = _build_sunburst_records(make_tensors(), group_repeated_blocks=True)
+        paths = node_paths(records["ids"], records["parents"], records["labels"])
+        nodes = dict(zip(paths, zip(records["values"], records["hover_texts"])))
+        self.assertEqual(nodes["Model.model.layers.*.weight"][0], 800)
+        self.assertIn("weight x 2", nodes["Model.model.layers.*.weight"][1])
+
+    def test_build_sunburst_records_truncation_mixes_tensors(self):
+        """Test that a truncated node merging different tensors is not colored as one of them."""
+        tensors = [
+            TensorInfo("model.layers.0.self_attn.q_proj.weight", "F32", [4, 4], 64, 16),
+            TensorInfo("model.layers.0.mlp.down_proj.weight", "F32", [4], 16, 4),
+        ]
+        records = _build_sunburst_records(tensors, max_depth=3)
+        paths = node_paths(records["ids"], records["parents"], records["labels"])
+        truncated = paths.index("Model.model.layers.0....")
+        self.assertEqual(records["values"][truncated], 80)
+        self.assertEqual(records["colors"][truncated], COLORS["DEFAULT"])
+        self.assertEqual(records["hover_texts"][truncated], "... x 2<br>Size: 80 B")
+
+        # A single truncated tensor keeps its own color
+        records = _build_sunburst_records(tensors[1:], max_depth=3)
+        self.assertEqual(records["colors"][-1], COLORS["MLP_DOWN"])
+
+    def test_build_sunburst_records_zero_size_tensors(self):
+        """Test that zero-size tensors are counted at every level but not drawn."""
+        empty = [TensorInfo(f"model.layers.{i}.scale", "F32", [0], 0, 0) for i in range(2)]
+        empty.append(TensorInfo("model.empty.scale", "F32", [0], 0, 0))
+        records = _build_sunburst_records(make_tensors() + empty)
+        paths = node_paths(records["ids"], records["parents"], records["labels"])
+        nodes = dict(zip(paths, records["labels"]))
+
+        self.assertEqual(records["labels"][0], "Model (8)")
+        self.assertEqual(records["values"][0], 4880)
+        self.assertEqual(nodes["Model.model"], "model (8)")
+        self.assertEqual(nodes["Model.model.layers.0"], "0 (3)")
+        self.assertFalse(any(path.endswith(".scale") or path.endswith(".empty") for path in paths))
+        self.assertIn("Zero-size tensors (not drawn): 3", records["hover_texts"][0])
+
+        # The root hover only mentions zero-size tensors when there are some
+        records = _build_sunburst_records(make_tensors())
+        self.assertNotIn("Zero-size", records["hover_texts"][0])
+
+    def test_visualize_model(self):
+        """Smoke test that visualize_model renders a figure and shows it."""
+        import plotly.graph_objects as go
+
+        with patch.object(go.Figure, "show", autospec=True) as mock_show:
+            visualize_model([self.safetensors_path], ["test_viz.safetensors"])
+
+        self.assertEqual(mock_show.call_count, 1)
+        fig = mock_show.call_args[0][0]
+        sunburst, metadata_table, legend_table = fig.data
+        self.assertIsInstance(sunburst, go.Sunburst)
+        self.assertEqual(sunburst.branchvalues, "total")
+        self.assertEqual(sorted(metadata_table.cells.values[0]), ["arch", "format"])
+        self.assertEqual(len(legend_table.cells.values[0]), len(LEGEND_INFO))
+
+        # The title is drawn as the sunburst's subplot title
+        self.assertIn("test_viz.safetensors", fig.layout.annotations[0].text)
+
+    def test_visualize_model_cache(self):
+        """Test that unchanged files reuse the cached records and edits invalidate them."""
+        import plotly.graph_objects as go
+        from model_explorer.visualizer import ModelLoader
+
+        path = self.root_dir / "test_viz_cache.safetensors"
+        create_safetensors(str(path))
+        self.addCleanup(os.remove, path)
+
+        with patch.object(go.Figure, "show", autospec=True) as mock_show, \
+                patch("model_explorer.visualizer.ModelLoader", wraps=ModelLoader) as mock_loader:
+            visualize_model([path], use_cache=True)
+            visualize_model([path], use_cache=True)
+            self.assertEqual(mock_loader.call_count, 1)
+
+            # Cached figures match freshly built ones
+            first, second = (call[0][0] for call in mock_show.call_args_list)
+            self.assertEqual(list(first.data[0].ids), list(second.data[0].ids))
+            self.assertEqual(list(first.data[0].values), list(second.data[0].values))
+            self.assertEqual(list(first.data[1].cells.values[0]), list(second.data[1].cells.values[0]))
+
+            # The cache is opt-in
+            visualize_model([path])
+            self.assertEqual(mock_loader.call_count, 2)
+
+            # Different options and a touched file both miss the cache
+            visualize_model([path], group_repeated_blocks=True, use_cache=True)
+            self.assertEqual(mock_loader.call_count, 3)
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            visualize_model([path], use_cache=True)
+            self.assertEqual(mock_loader.call_count, 4)
+
+    def test_visualize_model_cache_malformed_and_eviction(self):
+        """Test that malformed cache entries are misses and old entries are evicted."""
+        import plotly.graph_objects as go
+        from model_explorer import visualizer
+
+        key = visualizer._cache_key([self.safetensors_path], None, False)
+        cache_path = visualizer._cache_dir() / f"{key}.json"
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        for payload in [[], {"records": {}}, {"total_tensors": 5, "records": {"ids": []}, "metadata": []}]:
+            cache_path.write_text(json.dumps(payload))
+            self.assertIsNone(visualizer._load_cached(key))
+            with patch.object(go.Figure, "show", autospec=True) as mock_show:
+                visualize_model([self.safetensors_path], use_cache=True)
+            self.assertEqual(mock_show.call_count, 1)
+        # The rebuilt entry replaced the malformed one
+        self.assertIsNotNone(visualizer._load_cached(key))
+
+        # Only the most recently used entries survive eviction
+        cache_dir = visualizer._cache_dir()
+        for old_entry in cache_dir.glob("*.json"):
+            old_entry.unlink()
+        for i in range(4):
+            entry = cache_dir / f"entry{i}.json"
+            entry.write_text("{}")
+            os.utime(entry, ns=(i * 10**9, i * 10**9))
+        # A dangling link stands in for an entry another run removed mid-eviction
+        (cache_dir / "vanished.json").symlink_to(cache_dir / "missing")
+        with patch.object(visualizer, "MAX_CACHE_ENTRIES", 2):
+            visualizer._evict_cached(cache_dir)
+        self.assertEqual(sorted(p.name for p in cache_dir.glob("*.json")), ["entry2.json", "entry3.json", "vanished.json"])
+        (cache_dir / "vanished.json").unlink()
+
+    def test_visualize_model_cache_numpy_sizes(self):
+        """Test that numpy-typed sizes are cached and a failed write leaves no files behind."""
+        import numpy as np
+        import plotly.graph_objects as go
+        from model_explorer import visualizer
+
+        tensors = [TensorInfo("model.weight", "F32", [16], np.uint64(64), 16)]
+        with patch.object(go.Figure, "show", autospec=True) as mock_show, \
+                patch("model_explorer.visualizer.ModelLoader") as mock_loader:
+            mock_loader.return_value.tensors = tensors
+            mock_loader.return_value.metadata = []
+            visualize_model([self.safetensors_path], max_depth=7, use_cache=True)
+        self.assertEqual(mock_show.call_count, 1)
+
+        key = visualizer._cache_key([self.safetensors_path], 7, False)
+        cached = visualizer._load_cached(key)
+        self.assertEqual(cached["records"]["values"], [64, 64, 64])
+
+        # An entry json can't encode is reported, not raised
+        with patch("builtins.print"):
+            visualizer._store_cached("unencodable", {"value": object()})
+        self.assertFalse((visualizer._cache_dir() / "unencodable.json").exists())
+        self.assertEqual(list(visualizer._cache_dir().glob("*.tmp")), [])
 
 if __name__ == '__main__':
     unittest.main()